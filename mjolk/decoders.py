@@ -0,0 +1,313 @@
+import json
+import zlib
+
+from mjolk.parameter_exceptions import UndecodableParameterException
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# The largest body that will be inflated from a compressed payload, guarding
+# against decompression bombs. Can be overridden with the Flask config key
+# `MJOLK_MAX_DECOMPRESSED_SIZE`.
+MAX_DECOMPRESSED_SIZE = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# A zstd block of up to 128KB can be described in a handful of bytes, so the
+# input is fed in small slices to bound the output of each step.
+ZSTD_FEED_SIZE = 64
+
+DECODERS = {}
+DECOMPRESSORS = {}
+
+
+def register_decoder(content_type, decoder):
+    """Register a body decoder for a content type.
+
+    Args:
+        content_type (str): The mimetype, e.g. `application/json`.
+        decoder (Function): Takes the raw body bytes and returns a dict.
+    """
+    DECODERS[content_type.lower()] = decoder
+
+
+def register_decompressor(content_encoding, decompressor):
+    """Register a streaming decompressor for a content encoding.
+
+    Args:
+        content_encoding (str): The encoding, e.g. `gzip`.
+        decompressor (Function): Takes the request stream and the maximum
+            decompressed size and returns the decompressed body bytes.
+    """
+    DECOMPRESSORS[content_encoding.lower()] = decompressor
+
+
+def check_size(body, max_size):
+    """Check the decompressed body has not exceeded the maximum size.
+
+    Args:
+        body (bytearray): The decompressed body so far.
+        max_size (int): The maximum number of decompressed bytes.
+
+    Raises:
+        UndecodableParameterException: If the body exceeds the maximum size.
+    """
+    if len(body) > max_size:
+        raise UndecodableParameterException(
+            f"The decompressed body exceeds {max_size} bytes.")
+
+
+def check_trailing_data(decompressor, more_data):
+    """Check no data follows the end of the compressed stream.
+
+    Args:
+        decompressor (object): A zlib or zstd decompression object.
+        more_data (bool): Whether more compressed data is about to be fed.
+
+    Raises:
+        UndecodableParameterException: If the stream has ended and there is
+            more data.
+    """
+    if decompressor.unused_data or (more_data and decompressor.eof):
+        raise UndecodableParameterException(
+            "The compressed body has data after the end of the stream.")
+
+
+def inflate(stream, max_size, wbits):
+    """Incrementally inflate a zlib based stream up to a maximum size.
+
+    Args:
+        stream (file): The compressed request stream.
+        max_size (int): The maximum number of decompressed bytes.
+        wbits (int): The zlib window bits selecting the container format.
+
+    Returns:
+        bytes: The decompressed body.
+
+    Raises:
+        UndecodableParameterException: If the body is malformed, truncated,
+            has trailing data or exceeds the maximum size.
+    """
+    decompressor = zlib.decompressobj(wbits)
+    body = bytearray()
+
+    try:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            # Bound each step so a small chunk can never expand unchecked.
+            while chunk:
+                check_trailing_data(decompressor, True)
+                body += decompressor.decompress(chunk,
+                                                max_size - len(body) + 1)
+                check_size(body, max_size)
+                chunk = decompressor.unconsumed_tail
+
+        body += decompressor.flush()
+        check_trailing_data(decompressor, False)
+    except zlib.error as error:
+        raise UndecodableParameterException(
+            f"The compressed body is malformed: {error}.")
+
+    if not decompressor.eof or len(body) > max_size:
+        raise UndecodableParameterException(
+            "The compressed body is truncated or too large.")
+
+    return bytes(body)
+
+
+def gunzip(stream, max_size):
+    """Decompress a gzip encoded stream.
+
+    Args:
+        stream (file): The compressed request stream.
+        max_size (int): The maximum number of decompressed bytes.
+
+    Returns:
+        bytes: The decompressed body.
+    """
+    return inflate(stream, max_size, 16 + zlib.MAX_WBITS)
+
+
+def deflate(stream, max_size):
+    """Decompress a deflate (zlib wrapped) encoded stream.
+
+    Args:
+        stream (file): The compressed request stream.
+        max_size (int): The maximum number of decompressed bytes.
+
+    Returns:
+        bytes: The decompressed body.
+    """
+    return inflate(stream, max_size, zlib.MAX_WBITS)
+
+
+def unzstd(stream, max_size):
+    """Incrementally decompress a zstd encoded stream up to a maximum size.
+
+    Args:
+        stream (file): The compressed request stream.
+        max_size (int): The maximum number of decompressed bytes.
+
+    Returns:
+        bytes: The decompressed body.
+
+    Raises:
+        UndecodableParameterException: If the body is malformed, truncated,
+            has trailing data or exceeds the maximum size.
+    """
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    body = bytearray()
+
+    try:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            for start in range(0, len(chunk), ZSTD_FEED_SIZE):
+                check_trailing_data(decompressor, True)
+                body += decompressor.decompress(
+                    chunk[start:start + ZSTD_FEED_SIZE])
+                check_size(body, max_size)
+
+        check_trailing_data(decompressor, False)
+    except zstandard.ZstdError as error:
+        raise UndecodableParameterException(
+            f"The compressed body is malformed: {error}.")
+
+    if not decompressor.eof:
+        raise UndecodableParameterException(
+            "The compressed body is truncated.")
+
+    return bytes(body)
+
+
+def decode_json(body):
+    """Decode a JSON body.
+
+    Args:
+        body (bytes): The raw body.
+
+    Returns:
+        dict: The decoded parameters.
+
+    Raises:
+        UndecodableParameterException: If the body is not valid JSON or is
+            nested too deeply.
+    """
+    try:
+        return json.loads(body.decode('utf-8')) if body else {}
+    except RecursionError:
+        raise UndecodableParameterException("The JSON body is nested too deeply.")
+    except (UnicodeDecodeError, ValueError) as error:
+        raise UndecodableParameterException(
+            f"The JSON body is malformed: {error}.")
+
+
+def decode_msgpack(body):
+    """Decode a MessagePack body.
+
+    Args:
+        body (bytes): The raw body.
+
+    Returns:
+        dict: The decoded parameters.
+
+    Raises:
+        UndecodableParameterException: If the body is not valid MessagePack.
+    """
+    try:
+        return msgpack.unpackb(body, raw=False) if body else {}
+    except (msgpack.UnpackException, ValueError) as error:
+        raise UndecodableParameterException(
+            f"The MessagePack body is malformed: {error}.")
+
+
+def listify_dict(data):
+    """Wrap the decoded values in lists to match the form parameter layout.
+
+    Every value must be a string, or a list holding exactly one string, since
+    the fields only validate single string values.
+
+    Args:
+        data (dict): The decoded parameters.
+
+    Returns:
+        dict: The parameters with every value in a list.
+
+    Raises:
+        UndecodableParameterException: If the body is not a key value mapping
+            of single string values.
+    """
+    if not isinstance(data, dict):
+        raise UndecodableParameterException(
+            "The request body must be a key value mapping.")
+
+    parameters = {}
+
+    for key, value in data.items():
+        if not isinstance(key, str):
+            raise UndecodableParameterException(
+                "The request body keys must be strings.")
+
+        values = value if isinstance(value, list) else [value]
+
+        if len(values) != 1 or not isinstance(values[0], str):
+            raise UndecodableParameterException(
+                f"The '{key}' parameter must be a single string value.")
+
+        parameters[key] = values
+
+    return parameters
+
+
+def decode_request(request, max_size=MAX_DECOMPRESSED_SIZE):
+    """Decode the Flask request body into unvalidated parameters.
+
+    The decoder is chosen by the `Content-Type` and the decompressor by the
+    `Content-Encoding`. Unregistered content types fall back to the form data.
+
+    Args:
+        request (Request): The Flask request.
+        max_size (int): The maximum number of decompressed bytes.
+
+    Returns:
+        dict: The parameters with every value in a list.
+
+    Raises:
+        UndecodableParameterException: If the body cannot be decoded.
+    """
+    encoding = request.headers.get('Content-Encoding', 'identity')
+    encoding = encoding.strip().lower()
+    decoder = DECODERS.get(request.mimetype)
+
+    if encoding != 'identity' and encoding not in DECOMPRESSORS:
+        raise UndecodableParameterException(
+            f"Unsupported content encoding: '{encoding}'.")
+
+    if decoder is None:
+        if encoding != 'identity':
+            raise UndecodableParameterException(
+                f"Unsupported compressed content type: '{request.mimetype}'.")
+
+        return request.form.to_dict(flat=False)
+
+    if encoding == 'identity':
+        body = request.get_data(cache=False)
+    else:
+        body = DECOMPRESSORS[encoding](request.stream, max_size)
+
+    return listify_dict(decoder(body))
+
+
+register_decoder('application/json', decode_json)
+register_decompressor('gzip', gunzip)
+register_decompressor('x-gzip', gunzip)
+register_decompressor('deflate', deflate)
+
+if msgpack is not None:
+    register_decoder('application/msgpack', decode_msgpack)
+    register_decoder('application/x-msgpack', decode_msgpack)
+
+if zstandard is not None:
+    register_decompressor('zstd', unzstd)
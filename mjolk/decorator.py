@@ -1,7 +1,10 @@
 from functools import wraps
+from flask import current_app
 from flask import request
 from flask import jsonify
 
+from mjolk.decoders import MAX_DECOMPRESSED_SIZE
+from mjolk.decoders import decode_request
 from mjolk.validator import Validator
 
 
@@ -30,12 +33,14 @@ def validate(*fields):
 
         @wraps(func)
         def decorator():
-            """Call the field validators on the POSTed data.
+            """Decode the POSTed data and call the field validators on it.
 
             Returns:
                 dict: The successful JSON response.
             """
-            data = dict(request.form)
+            max_size = current_app.config.get('MJOLK_MAX_DECOMPRESSED_SIZE',
+                                              MAX_DECOMPRESSED_SIZE)
+            data = decode_request(request, max_size)
             validated_parameters = Validator(func, fields).validate(data)
 
             return jsonify(code=200, message=func(**validated_parameters)), 200
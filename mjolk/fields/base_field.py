@@ -3,6 +3,10 @@ from mjolk.parameter_exceptions import MissingParameterException
 
 class BaseField:
 
+    # An optional validation result cache shared by every field, such as a
+    # `SharedMemoryCache`.
+    cache = None
+
     def __init__(self, name=None, default=None):
         self.name = name or self.name()
         self.default = default
@@ -31,4 +35,7 @@ class BaseField:
             raise MissingParameterException(
                 f"The '{self.name}' field must be supplied.")
 
+        if self.cache is not None:
+            return self.cache.validate(self, value)
+
         return self.validate_value(value)
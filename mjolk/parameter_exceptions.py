@@ -16,3 +16,8 @@ class MissingParameterException(ParameterException):
 class UnrecognizedParameterException(ParameterException):
     """Exception for unrecognized parameters."""
     pass
+
+
+class UndecodableParameterException(ParameterException):
+    """Exception for request bodies that cannot be decoded."""
+    pass
@@ -0,0 +1,387 @@
+from contextlib import contextmanager
+import fcntl
+import hashlib
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+
+from mjolk.parameter_exceptions import InvalidParameterException
+
+DEFAULT_SLOT_COUNT = 65536
+DEFAULT_SLOT_SIZE = 256
+
+# The number of neighbouring slots a key may live in.
+PROBE_LENGTH = 8
+
+MAGIC = b'MJLK'
+# Magic, slot count, slot size and the shared clock hand.
+HEADER = struct.Struct('<4sIIQ')
+HEADER_SIZE = 64
+HAND_OFFSET = 12
+
+# Sequence, key hash, reference bit, status, key length and value length.
+SLOT = struct.Struct('<IQBBHH')
+SEQUENCE = struct.Struct('<I')
+# Sequence numbers wrap around, which keeps their parity since the modulus
+# is even.
+SEQUENCE_MASK = 0xFFFFFFFF
+REFERENCE_OFFSET = 12
+
+EMPTY = 0
+VALID = 1
+INVALID = 2
+
+
+class SharedMemoryCacheException(Exception):
+    """Exception for invalid cache layouts or unsafe cache files."""
+    pass
+
+
+class SharedMemoryCache:
+    """A validation result cache shared by every process on the host.
+
+    The results live in fixed size slots of a memory mapped file. Reads are
+    lock free, using a per slot sequence number to detect torn reads, while
+    writes are serialized with a file lock and evict entries clock style.
+    """
+
+    def __init__(self,
+                 path=None,
+                 slot_count=DEFAULT_SLOT_COUNT,
+                 slot_size=DEFAULT_SLOT_SIZE):
+        # Both are packed into the header as unsigned 32 bit integers, and the
+        # key and value lengths within a slot as unsigned 16 bit integers.
+        if not 1 <= slot_count <= 0xFFFFFFFF:
+            raise SharedMemoryCacheException(
+                f"The slot count must be between 1 and {0xFFFFFFFF}.")
+
+        if not SLOT.size < slot_size <= SLOT.size + 0xFFFF:
+            raise SharedMemoryCacheException(
+                f"The slot size must be between {SLOT.size + 1} and " +
+                f"{SLOT.size + 0xFFFF} bytes.")
+
+        self.path = path or SharedMemoryCache.default_path(
+            slot_count, slot_size)
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.size = HEADER_SIZE + slot_count * slot_size
+        self.thread_lock = threading.Lock()
+        self.file_descriptor = os.open(
+            self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC,
+            0o600)
+
+        try:
+            SharedMemoryCache.check_private(
+                os.fstat(self.file_descriptor), self.path, stat.S_ISREG)
+
+            with self.lock():
+                self.initialize()
+        except Exception:
+            os.close(self.file_descriptor)
+            raise
+
+        self.buffer = mmap.mmap(self.file_descriptor, self.size)
+
+    @contextmanager
+    def lock(self):
+        """Hold the write lock across threads and processes."""
+        with self.thread_lock:
+            fcntl.lockf(self.file_descriptor, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.file_descriptor, fcntl.LOCK_UN)
+
+    @staticmethod
+    def check_private(status, path, is_type):
+        """Check that a path is owned by and only accessible to this user.
+
+        Otherwise another local user could plant entries in the cache and
+        have their values returned as validated.
+
+        Args:
+            status (os.stat_result): The status of the path.
+            path (str): The path, for the error message.
+            is_type (Function): Checks the mode is of the expected file type.
+
+        Raises:
+            SharedMemoryCacheException: If the path is not private.
+        """
+        if (not is_type(status.st_mode) or status.st_uid != os.geteuid() or
+                status.st_mode & 0o077):
+            raise SharedMemoryCacheException(
+                f"The cache path '{path}' must be owned by the current user " +
+                "and not accessible to anyone else.")
+
+    @staticmethod
+    def default_directory():
+        """Return a directory private to the current user for cache files.
+
+        Returns:
+            str: The directory path.
+        """
+        directory = os.path.join(tempfile.gettempdir(),
+                                 f'mjolk-{os.geteuid()}')
+
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+
+        SharedMemoryCache.check_private(
+            os.lstat(directory), directory, stat.S_ISDIR)
+
+        return directory
+
+    @staticmethod
+    def default_path(slot_count, slot_size):
+        """Return the default cache file path for a layout.
+
+        Naming the file after its layout keeps caches of different sizes on
+        the same host from sharing a file.
+
+        Args:
+            slot_count (int): The number of slots.
+            slot_size (int): The size of each slot in bytes.
+
+        Returns:
+            str: The cache file path.
+        """
+        return os.path.join(SharedMemoryCache.default_directory(),
+                            f'validation_cache_{slot_count}x{slot_size}')
+
+    def initialize(self):
+        """Lay out a new cache file, or check an existing one matches.
+
+        An existing file is never resized since other processes may have it
+        mapped, and shrinking it under them would crash them.
+
+        Raises:
+            SharedMemoryCacheException: If the file has a different layout.
+        """
+        size = os.fstat(self.file_descriptor).st_size
+        expected = HEADER.pack(MAGIC, self.slot_count, self.slot_size, 0)
+
+        if size == 0:
+            os.ftruncate(self.file_descriptor, self.size)
+            os.pwrite(self.file_descriptor, expected, 0)
+            return
+
+        header = os.pread(self.file_descriptor, HEADER.size, 0)
+
+        if size != self.size or header[:HAND_OFFSET] != expected[:HAND_OFFSET]:
+            raise SharedMemoryCacheException(
+                f"The cache file '{self.path}' does not have the layout of " +
+                f"{self.slot_count} slots of {self.slot_size} bytes.")
+
+    def close(self):
+        """Unmap and close the cache file."""
+        self.buffer.close()
+        os.close(self.file_descriptor)
+
+    @staticmethod
+    def hash_key(key):
+        """Return a hash of the key that is stable across processes.
+
+        Args:
+            key (bytes): The cache key.
+
+        Returns:
+            int: The 64 bit key hash.
+        """
+        return int.from_bytes(
+            hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+    def offsets(self, key_hash):
+        """Return the offsets of the slots the key may live in.
+
+        Args:
+            key_hash (int): The key hash.
+
+        Returns:
+            List[int]: The slot offsets.
+        """
+        start = key_hash % self.slot_count
+
+        return [
+            HEADER_SIZE + ((start + index) % self.slot_count) * self.slot_size
+            for index in range(min(PROBE_LENGTH, self.slot_count))
+        ]
+
+    def get(self, key):
+        """Return the cached status and value for a key.
+
+        Args:
+            key (bytes): The cache key.
+
+        Returns:
+            tuple: The status and value bytes, or None on a miss.
+        """
+        key_hash = SharedMemoryCache.hash_key(key)
+
+        for offset in self.offsets(key_hash):
+            (sequence, slot_hash, reference, status, key_length,
+             value_length) = SLOT.unpack_from(self.buffer, offset)
+
+            if sequence & 1 or status == EMPTY or slot_hash != key_hash:
+                continue
+
+            start = offset + SLOT.size
+            end = start + key_length
+            slot_key = self.buffer[start:end]
+            value = self.buffer[end:end + value_length]
+
+            # A writer changed the slot while it was being copied.
+            if SEQUENCE.unpack_from(self.buffer, offset)[0] != sequence:
+                continue
+
+            if slot_key == key:
+                # Only write when needed, so hot keys stay read only pages.
+                if not reference:
+                    self.buffer[offset + REFERENCE_OFFSET] = 1
+
+                return status, value
+
+        return None
+
+    def set(self, key, status, value):
+        """Store a status and value for a key, evicting if necessary.
+
+        Entries too large for a slot are not cached.
+
+        Args:
+            key (bytes): The cache key.
+            status (int): Either `VALID` or `INVALID`.
+            value (bytes): The validated value or the error message.
+        """
+        if SLOT.size + len(key) + len(value) > self.slot_size:
+            return
+
+        key_hash = SharedMemoryCache.hash_key(key)
+
+        with self.lock():
+            offset = self.find_slot(key, key_hash)
+            sequence = SEQUENCE.unpack_from(self.buffer, offset)[0]
+            start = offset + SLOT.size
+            end = start + len(key)
+
+            # Force the parity, since a writer killed mid write leaves the
+            # sequence odd.
+            writing = (sequence | 1) & SEQUENCE_MASK
+
+            SEQUENCE.pack_into(self.buffer, offset, writing)
+            self.buffer[start:end] = key
+            self.buffer[end:end + len(value)] = value
+            SLOT.pack_into(self.buffer, offset, writing, key_hash, 1, status,
+                           len(key), len(value))
+            SEQUENCE.pack_into(self.buffer, offset,
+                               (writing + 1) & SEQUENCE_MASK)
+
+    def find_slot(self, key, key_hash):
+        """Return the offset to write the key to.
+
+        Prefers the slot already holding the key, then an empty slot, and
+        otherwise sweeps the clock hand over the neighbouring slots, giving
+        recently read entries a second chance before evicting one.
+
+        Args:
+            key (bytes): The cache key.
+            key_hash (int): The key hash.
+
+        Returns:
+            int: The slot offset.
+        """
+        offsets = self.offsets(key_hash)
+        empty_offsets = []
+
+        for offset in offsets:
+            _, slot_hash, _, status, key_length, _ = SLOT.unpack_from(
+                self.buffer, offset)
+            start = offset + SLOT.size
+
+            if status == EMPTY:
+                empty_offsets.append(offset)
+            elif (slot_hash == key_hash and
+                  self.buffer[start:start + key_length] == key):
+                return offset
+
+        if empty_offsets:
+            return empty_offsets[0]
+
+        hand = struct.unpack_from('<Q', self.buffer, HAND_OFFSET)[0]
+        struct.pack_into('<Q', self.buffer, HAND_OFFSET, hand + 1)
+
+        for index in range(2 * len(offsets)):
+            offset = offsets[(hand + index) % len(offsets)]
+
+            if not self.buffer[offset + REFERENCE_OFFSET]:
+                return offset
+
+            self.buffer[offset + REFERENCE_OFFSET] = 0
+
+        return offsets[hand % len(offsets)]
+
+    @staticmethod
+    def field_key(field, value):
+        """Return the cache key for a field and a raw value.
+
+        Args:
+            field (BaseField): The field validating the value.
+            value (str): A user inputted value.
+
+        Returns:
+            bytes: The cache key.
+        """
+        field_class = type(field)
+
+        return '\0'.join((field_class.__module__, field_class.__qualname__,
+                          field.name, value)).encode('utf-8', 'surrogatepass')
+
+    def validate(self, field, value):
+        """Validate a value with a field, sharing the result across processes.
+
+        Only string values and results are cached, along with the messages
+        of plain `InvalidParameterException` errors.
+
+        Args:
+            field (BaseField): The field validating the value.
+            value (str): A user inputted value.
+
+        Returns:
+            str: A validated value.
+
+        Raises:
+            InvalidParameterException: If the value is not valid.
+        """
+        if not isinstance(value, str):
+            return field.validate_value(value)
+
+        key = SharedMemoryCache.field_key(field, value)
+        cached = self.get(key)
+
+        if cached is not None:
+            status, payload = cached
+            payload = payload.decode('utf-8', 'surrogatepass')
+
+            if status == INVALID:
+                raise InvalidParameterException(payload)
+
+            return payload
+
+        try:
+            result = field.validate_value(value)
+        except InvalidParameterException as error:
+            if type(error) is InvalidParameterException:
+                self.set(key, INVALID,
+                         str(error).encode('utf-8', 'surrogatepass'))
+            raise
+
+        if isinstance(result, str):
+            self.set(key, VALID, result.encode('utf-8', 'surrogatepass'))
+
+        return result
+
@@ -14,6 +14,10 @@ setup(
     include_package_data=True,
     platforms='any',
     install_requires=['Flask'],
+    extras_require={
+        'msgpack': ['msgpack'],
+        'zstd': ['zstandard'],
+    },
     classifiers=[
         'Environment :: Web Environment',
         'Intended Audience :: Developers',
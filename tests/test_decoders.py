@@ -0,0 +1,200 @@
+import gzip
+import io
+import json
+import zlib
+
+from pytest import importorskip
+from pytest import raises
+
+from mjolk.decoders import DECODERS
+from mjolk.decoders import decode_json
+from mjolk.decoders import deflate
+from mjolk.decoders import gunzip
+from mjolk.decoders import listify_dict
+from mjolk.decoders import register_decoder
+from mjolk.parameter_exceptions import UndecodableParameterException
+
+
+def test_decoders_decode_json():
+    expected = {'sha': 'value'}
+    actual = decode_json(b'{"sha": "value"}')
+
+    assert expected == actual
+
+
+def test_decoders_decode_json_empty_body():
+    expected = {}
+    actual = decode_json(b'')
+
+    assert expected == actual
+
+
+def test_decoders_decode_json_malformed():
+    with raises(UndecodableParameterException):
+        decode_json(b'{"sha": ')
+
+
+def test_decoders_listify_dict():
+    data = {'field': 'value', 'other_field': ['other_value']}
+
+    expected = {'field': ['value'], 'other_field': ['other_value']}
+    actual = listify_dict(data)
+
+    assert expected == actual
+
+
+def test_decoders_listify_dict_not_a_mapping():
+    with raises(UndecodableParameterException) as exception:
+        listify_dict(['value'])
+
+    assert exception.match("The request body must be a key value mapping.")
+
+
+def test_decoders_gunzip():
+    stream = io.BytesIO(gzip.compress(b'{"sha": "value"}'))
+
+    expected = b'{"sha": "value"}'
+    actual = gunzip(stream, 1024)
+
+    assert expected == actual
+
+
+def test_decoders_deflate():
+    stream = io.BytesIO(zlib.compress(b'{"sha": "value"}'))
+
+    expected = b'{"sha": "value"}'
+    actual = deflate(stream, 1024)
+
+    assert expected == actual
+
+
+def test_decoders_gunzip_decompression_bomb():
+    stream = io.BytesIO(gzip.compress(b'0' * 1024 * 1024))
+
+    with raises(UndecodableParameterException) as exception:
+        gunzip(stream, 1024)
+
+    assert exception.match("The decompressed body exceeds 1024 bytes.")
+
+
+def test_decoders_gunzip_truncated():
+    stream = io.BytesIO(gzip.compress(b'{"sha": "value"}')[:-10])
+
+    with raises(UndecodableParameterException):
+        gunzip(stream, 1024)
+
+
+def test_decoders_gunzip_trailing_data():
+    stream = io.BytesIO(
+        gzip.compress(b'{"sha": "value"}') + gzip.compress(b'xx'))
+
+    with raises(UndecodableParameterException) as exception:
+        gunzip(stream, 1024)
+
+    assert exception.match(
+        "The compressed body has data after the end of the stream.")
+
+
+def test_decoders_deflate_trailing_data():
+    stream = io.BytesIO(zlib.compress(b'{"sha": "value"}') + b'xx')
+
+    with raises(UndecodableParameterException) as exception:
+        deflate(stream, 1024)
+
+    assert exception.match(
+        "The compressed body has data after the end of the stream.")
+
+
+def test_decoders_unzstd_truncated():
+    zstandard = importorskip('zstandard')
+    from mjolk.decoders import unzstd
+    stream = io.BytesIO(
+        zstandard.ZstdCompressor().compress(b'{"sha": "value"}')[:-4])
+
+    with raises(UndecodableParameterException) as exception:
+        unzstd(stream, 1024)
+
+    assert exception.match("The compressed body is truncated.")
+
+
+def test_decoders_unzstd_trailing_data():
+    zstandard = importorskip('zstandard')
+    from mjolk.decoders import unzstd
+    compressor = zstandard.ZstdCompressor()
+    stream = io.BytesIO(
+        compressor.compress(b'{"sha": "value"}') + compressor.compress(b'xx'))
+
+    with raises(UndecodableParameterException) as exception:
+        unzstd(stream, 1024)
+
+    assert exception.match(
+        "The compressed body has data after the end of the stream.")
+
+
+def test_decoders_gunzip_malformed():
+    stream = io.BytesIO(b'not gzip')
+
+    with raises(UndecodableParameterException):
+        gunzip(stream, 1024)
+
+
+def test_decoders_register_decoder():
+    register_decoder('Application/X-Test', json.loads)
+
+    assert DECODERS.pop('application/x-test') is json.loads
+
+
+def test_decoders_decode_msgpack():
+    msgpack = importorskip('msgpack')
+    from mjolk.decoders import decode_msgpack
+
+    expected = {'sha': 'value'}
+    actual = decode_msgpack(msgpack.packb({'sha': 'value'}))
+
+    assert expected == actual
+
+
+def test_decoders_listify_dict_empty_list():
+    with raises(UndecodableParameterException) as exception:
+        listify_dict({'field': []})
+
+    assert exception.match("The 'field' parameter must be a single string value.")
+
+
+def test_decoders_listify_dict_non_string_key():
+    with raises(UndecodableParameterException) as exception:
+        listify_dict({1: 'value'})
+
+    assert exception.match("The request body keys must be strings.")
+
+
+def test_decoders_unzstd():
+    zstandard = importorskip('zstandard')
+    from mjolk.decoders import unzstd
+    stream = io.BytesIO(
+        zstandard.ZstdCompressor().compress(b'{"sha": "value"}'))
+
+    expected = b'{"sha": "value"}'
+    actual = unzstd(stream, 1024)
+
+    assert expected == actual
+
+
+def test_decoders_unzstd_decompression_bomb():
+    zstandard = importorskip('zstandard')
+    from mjolk.decoders import unzstd
+    stream = io.BytesIO(
+        zstandard.ZstdCompressor().compress(b'0' * 1024 * 1024))
+
+    with raises(UndecodableParameterException) as exception:
+        unzstd(stream, 1024)
+
+    assert exception.match("The decompressed body exceeds 1024 bytes.")
+
+
+def test_decoders_unzstd_malformed():
+    importorskip('zstandard')
+    from mjolk.decoders import unzstd
+
+    with raises(UndecodableParameterException):
+        unzstd(io.BytesIO(b'not zstd'), 1024)
@@ -1,4 +1,8 @@
+import gzip
 import json
+import zlib
+
+from pytest import importorskip
 
 from mjolk.decorator import validate
 from mjolk.fields.git_sha_field import GitShaField
@@ -64,3 +68,268 @@ def test_validate_on_function_no_args(client):
     actual = json.loads(client.post('/test_endpoint', data=data).data)
 
     assert expected == actual
+
+
+def test_validate_on_function_json(client):
+    data = json.dumps({'sha': 'ee81358f199c0ea27d9e8960f32524c2f14331a0'})
+
+    expected = {
+        'code': 200,
+        'message': 'validated_ee81358f199c0ea27d9e8960f32524c2f14331a0'
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint', data=data, content_type='application/json').data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_gzip_json(client):
+    data = gzip.compress(
+        json.dumps({
+            'sha': 'ee81358f199c0ea27d9e8960f32524c2f14331a0'
+        }).encode('utf-8'))
+
+    expected = {
+        'code': 200,
+        'message': 'validated_ee81358f199c0ea27d9e8960f32524c2f14331a0'
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint',
+            data=data,
+            content_type='application/json',
+            headers={
+                'Content-Encoding': 'gzip'
+            }).data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_unsupported_encoding(client):
+    data = json.dumps({'sha': 'ee81358f199c0ea27d9e8960f32524c2f14331a0'})
+
+    expected = {
+        'code': 400,
+        'message': "Unsupported content encoding: 'br'."
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint',
+            data=data,
+            content_type='application/json',
+            headers={
+                'Content-Encoding': 'br'
+            }).data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_json_empty_list(client):
+    data = json.dumps({'sha': []})
+
+    expected = {
+        'code': 400,
+        'message': "The 'sha' parameter must be a single string value."
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint', data=data, content_type='application/json').data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_json_multiple_values(client):
+    data = json.dumps({'sha': ['a', 'b']})
+
+    expected = {
+        'code': 400,
+        'message': "The 'sha' parameter must be a single string value."
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint', data=data, content_type='application/json').data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_json_number(client):
+    data = json.dumps({'sha': 123})
+
+    expected = {
+        'code': 400,
+        'message': "The 'sha' parameter must be a single string value."
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint', data=data, content_type='application/json').data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_json_nested_object(client):
+    data = json.dumps({'sha': [{'x': 1}]})
+
+    expected = {
+        'code': 400,
+        'message': "The 'sha' parameter must be a single string value."
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint', data=data, content_type='application/json').data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_msgpack_binary(client):
+    msgpack = importorskip('msgpack')
+    data = msgpack.packb({'sha': b'ee81358f199c0ea27d9e8960f32524c2f14331a0'})
+
+    expected = {
+        'code': 400,
+        'message': "The 'sha' parameter must be a single string value."
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint', data=data,
+            content_type='application/msgpack').data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_deflate_json(client):
+    data = zlib.compress(
+        json.dumps({
+            'sha': 'ee81358f199c0ea27d9e8960f32524c2f14331a0'
+        }).encode('utf-8'))
+
+    expected = {
+        'code': 200,
+        'message': 'validated_ee81358f199c0ea27d9e8960f32524c2f14331a0'
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint',
+            data=data,
+            content_type='application/json',
+            headers={
+                'Content-Encoding': 'deflate'
+            }).data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_zstd_json(client):
+    zstandard = importorskip('zstandard')
+    data = zstandard.ZstdCompressor().compress(
+        json.dumps({
+            'sha': 'ee81358f199c0ea27d9e8960f32524c2f14331a0'
+        }).encode('utf-8'))
+
+    expected = {
+        'code': 200,
+        'message': 'validated_ee81358f199c0ea27d9e8960f32524c2f14331a0'
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint',
+            data=data,
+            content_type='application/json',
+            headers={
+                'Content-Encoding': 'zstd'
+            }).data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_msgpack(client):
+    msgpack = importorskip('msgpack')
+    data = msgpack.packb({'sha': 'ee81358f199c0ea27d9e8960f32524c2f14331a0'})
+
+    expected = {
+        'code': 200,
+        'message': 'validated_ee81358f199c0ea27d9e8960f32524c2f14331a0'
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint', data=data,
+            content_type='application/msgpack').data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_gzip_msgpack(client):
+    msgpack = importorskip('msgpack')
+    data = gzip.compress(
+        msgpack.packb({
+            'sha': 'ee81358f199c0ea27d9e8960f32524c2f14331a0'
+        }))
+
+    expected = {
+        'code': 200,
+        'message': 'validated_ee81358f199c0ea27d9e8960f32524c2f14331a0'
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint',
+            data=data,
+            content_type='application/msgpack',
+            headers={
+                'Content-Encoding': 'gzip'
+            }).data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_gzip_decompression_bomb(client):
+    client.application.config['MJOLK_MAX_DECOMPRESSED_SIZE'] = 1024
+    data = gzip.compress(b'0' * 1024 * 1024)
+
+    expected = {
+        'code': 400,
+        'message': 'The decompressed body exceeds 1024 bytes.'
+    }
+    response = client.post(
+        '/test_endpoint',
+        data=data,
+        content_type='application/json',
+        headers={
+            'Content-Encoding': 'gzip'
+        })
+    del client.application.config['MJOLK_MAX_DECOMPRESSED_SIZE']
+    actual = json.loads(response.data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_json_nested_too_deeply(client):
+    data = b'[' * 200000
+
+    expected = {'code': 400, 'message': 'The JSON body is nested too deeply.'}
+    actual = json.loads(
+        client.post(
+            '/test_endpoint', data=data, content_type='application/json').data)
+
+    assert expected == actual
+
+
+def test_validate_on_function_gzip_trailing_data(client):
+    data = gzip.compress(
+        json.dumps({
+            'sha': 'ee81358f199c0ea27d9e8960f32524c2f14331a0'
+        }).encode('utf-8')) + gzip.compress(b'xx')
+
+    expected = {
+        'code': 400,
+        'message': 'The compressed body has data after the end of the stream.'
+    }
+    actual = json.loads(
+        client.post(
+            '/test_endpoint',
+            data=data,
+            content_type='application/json',
+            headers={
+                'Content-Encoding': 'gzip'
+            }).data)
+
+    assert expected == actual
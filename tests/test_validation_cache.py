@@ -0,0 +1,262 @@
+import multiprocessing
+import os
+
+from pytest import fixture
+from pytest import raises
+
+from mjolk.fields.base_field import BaseField
+from mjolk.parameter_exceptions import InvalidParameterException
+from mjolk.validation_cache import INVALID
+from mjolk.validation_cache import REFERENCE_OFFSET
+from mjolk.validation_cache import SEQUENCE
+from mjolk.validation_cache import SLOT
+from mjolk.validation_cache import VALID
+from mjolk.validation_cache import SharedMemoryCache
+from mjolk.validation_cache import SharedMemoryCacheException
+
+
+class CountingField(BaseField):
+
+    calls = 0
+
+    def name(self):  # pylint: disable=no-self-use
+        return 'field'
+
+    def validate_value(self, value):
+        CountingField.calls += 1
+
+        if value == 'value':
+            return value
+
+        raise InvalidParameterException(f"The value '{value}' is not valid.")
+
+
+@fixture
+def cache(tmpdir):
+    cache = SharedMemoryCache(
+        path=str(tmpdir.join('cache')), slot_count=16, slot_size=128)
+
+    yield cache
+
+    cache.close()
+
+
+@fixture
+def cached_field(cache):
+    CountingField.calls = 0
+    BaseField.cache = cache
+
+    yield CountingField()
+
+    BaseField.cache = None
+
+
+def write_entry(path):
+    cache = SharedMemoryCache(path=path, slot_count=16, slot_size=128)
+    cache.set(b'key', VALID, b'value')
+    cache.close()
+
+
+def test_validation_cache_get_miss(cache):
+    assert cache.get(b'key') is None
+
+
+def test_validation_cache_set_and_get(cache):
+    cache.set(b'key', VALID, b'value')
+
+    expected = (VALID, b'value')
+    actual = cache.get(b'key')
+
+    assert expected == actual
+
+
+def test_validation_cache_overwrite(cache):
+    cache.set(b'key', VALID, b'value')
+    cache.set(b'key', INVALID, b'message')
+
+    expected = (INVALID, b'message')
+    actual = cache.get(b'key')
+
+    assert expected == actual
+
+
+def test_validation_cache_entry_too_large(cache):
+    cache.set(b'key', VALID, b'v' * 128)
+
+    assert cache.get(b'key') is None
+
+
+def test_validation_cache_eviction(cache):
+    for index in range(64):
+        cache.set(f'key_{index}'.encode(), VALID, b'value')
+
+    assert cache.get(b'key_63') == (VALID, b'value')
+    assert sum(
+        cache.get(f'key_{index}'.encode()) is not None
+        for index in range(64)) <= 16
+
+
+def test_validation_cache_shared_between_processes(cache):
+    process = multiprocessing.get_context('fork').Process(
+        target=write_entry, args=(cache.path,))
+    process.start()
+    process.join()
+
+    expected = (VALID, b'value')
+    actual = cache.get(b'key')
+
+    assert expected == actual
+
+
+def test_validation_cache_reopen_keeps_entries(cache):
+    cache.set(b'key', VALID, b'value')
+    reopened = SharedMemoryCache(path=cache.path, slot_count=16, slot_size=128)
+
+    expected = (VALID, b'value')
+    actual = reopened.get(b'key')
+    reopened.close()
+
+    assert expected == actual
+
+
+def test_validation_cache_different_layout(cache):
+    cache.set(b'key', VALID, b'value')
+
+    with raises(SharedMemoryCacheException):
+        SharedMemoryCache(path=cache.path, slot_count=1024, slot_size=128)
+
+    expected = (VALID, b'value')
+    actual = cache.get(b'key')
+
+    assert expected == actual
+
+
+def test_validation_cache_no_slots(tmpdir):
+    with raises(SharedMemoryCacheException) as exception:
+        SharedMemoryCache(path=str(tmpdir.join('cache')), slot_count=0)
+
+    assert exception.match("The slot count must be between 1 and 4294967295.")
+    assert not tmpdir.join('cache').exists()
+
+
+def test_validation_cache_slot_size_too_small(tmpdir):
+    with raises(SharedMemoryCacheException):
+        SharedMemoryCache(
+            path=str(tmpdir.join('cache')), slot_count=16, slot_size=SLOT.size)
+
+
+def test_validation_cache_slot_size_too_large(tmpdir):
+    with raises(SharedMemoryCacheException):
+        SharedMemoryCache(
+            path=str(tmpdir.join('cache')),
+            slot_count=16,
+            slot_size=SLOT.size + 0x10000)
+
+
+def test_validation_cache_largest_slot_size(tmpdir):
+    cache = SharedMemoryCache(
+        path=str(tmpdir.join('cache')),
+        slot_count=1,
+        slot_size=SLOT.size + 0xFFFF)
+    cache.set(b'key', VALID, b'v' * (0xFFFF - 3))
+
+    expected = (VALID, b'v' * (0xFFFF - 3))
+    actual = cache.get(b'key')
+    cache.close()
+
+    assert expected == actual
+
+
+def test_validation_cache_default_path_includes_layout():
+    path = SharedMemoryCache.default_path(1024, 128)
+
+    assert path.endswith('validation_cache_1024x128')
+    assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+
+
+def test_validation_cache_accessible_to_others(tmpdir):
+    path = tmpdir.join('cache')
+    path.write('')
+    path.chmod(0o666)
+
+    with raises(SharedMemoryCacheException):
+        SharedMemoryCache(path=str(path), slot_count=16, slot_size=128)
+
+
+def test_validation_cache_symlink(tmpdir):
+    target = tmpdir.join('target')
+    target.write('data')
+    tmpdir.join('cache').mksymlinkto(target)
+
+    with raises(OSError):
+        SharedMemoryCache(
+            path=str(tmpdir.join('cache')), slot_count=16, slot_size=128)
+
+    assert target.read() == 'data'
+
+
+def test_validation_cache_field_valid_value(cached_field):
+    assert cached_field.validate('value') == 'value'
+    assert cached_field.validate('value') == 'value'
+    assert CountingField.calls == 1
+
+
+def test_validation_cache_field_invalid_value(cached_field):
+    for _ in range(2):
+        with raises(InvalidParameterException) as exception:
+            cached_field.validate('invalid')
+
+        assert exception.match("The value 'invalid' is not valid.")
+
+    assert CountingField.calls == 1
+
+
+def test_validation_cache_field_name_in_key(cached_field):
+    cached_field.validate('value')
+    CountingField(name='other_field').validate('value')
+
+    assert CountingField.calls == 2
+
+
+def test_validation_cache_sequence_wraps(cache):
+    cache.set(b'key', VALID, b'value')
+    offset = next(
+        offset for offset in cache.offsets(SharedMemoryCache.hash_key(b'key'))
+        if cache.buffer[offset + SLOT.size:offset + SLOT.size + 3] == b'key')
+    SEQUENCE.pack_into(cache.buffer, offset, 0xFFFFFFFE)
+
+    cache.set(b'key', INVALID, b'message')
+
+    expected = (INVALID, b'message')
+    actual = cache.get(b'key')
+
+    assert expected == actual
+    assert SEQUENCE.unpack_from(cache.buffer, offset)[0] == 0
+
+
+def test_validation_cache_recovers_from_odd_sequence(cache):
+    cache.set(b'key', VALID, b'value')
+    offset = next(
+        offset for offset in cache.offsets(SharedMemoryCache.hash_key(b'key'))
+        if cache.buffer[offset + SLOT.size:offset + SLOT.size + 3] == b'key')
+    SEQUENCE.pack_into(cache.buffer, offset, 5)
+
+    cache.set(b'key', INVALID, b'message')
+
+    expected = (INVALID, b'message')
+    actual = cache.get(b'key')
+
+    assert expected == actual
+    assert SEQUENCE.unpack_from(cache.buffer, offset)[0] == 6
+
+
+def test_validation_cache_hit_sets_reference(cache):
+    cache.set(b'key', VALID, b'value')
+    offset = next(
+        offset for offset in cache.offsets(SharedMemoryCache.hash_key(b'key'))
+        if cache.buffer[offset + SLOT.size:offset + SLOT.size + 3] == b'key')
+    cache.buffer[offset + REFERENCE_OFFSET] = 0
+
+    cache.get(b'key')
+
+    assert cache.buffer[offset + REFERENCE_OFFSET] == 1